@@ -3,8 +3,13 @@
 
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
 import sqlite3
 import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 
 # --- Configuration ---
@@ -12,20 +17,120 @@ from datetime import datetime
 DB_FILE = "food_waste_management.db"
 # Define the directory where the CSV data files are located
 DATA_DIR = "data"
+# Number of CSV rows read into memory at a time when seeding the database
+CSV_CHUNKSIZE = 10_000
+# Column types for each seed CSV, matching the table schemas, so pandas
+# doesn't have to infer them
+CSV_DTYPES = {
+    "Providers": {"Provider_ID": "Int64", "Name": "string", "Type": "string", "Address": "string", "City": "string", "Contact": "string"},
+    "Receivers": {"Receiver_ID": "Int64", "Name": "string", "Type": "string", "City": "string", "Contact": "string"},
+    "Food_Listings": {"Food_ID": "Int64", "Food_Name": "string", "Quantity": "Int64", "Provider_ID": "Int64", "Provider_Type": "string", "Location": "string", "Food_Type": "string", "Meal_Type": "string"},
+    "Claims": {"Claim_ID": "Int64", "Food_ID": "Int64", "Receiver_ID": "Int64", "Status": "string"},
+}
+# DATE/DATETIME columns parsed while reading the seed CSVs, with their formats
+CSV_DATE_FORMATS = {
+    "Food_Listings": {"Expiry_Date": "%m/%d/%Y"},
+    "Claims": {"Timestamp": "%m/%d/%Y %H:%M"},
+}
+# Text format each parsed date column is stored in; DATE columns match what
+# the Add Food Listing form inserts
+DB_DATE_FORMATS = {
+    "Expiry_Date": "%Y-%m-%d",
+    "Timestamp": "%Y-%m-%d %H:%M:%S",
+}
+# Secondary indexes created alongside the tables
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_fl_provider ON Food_Listings(Provider_ID);",
+    "CREATE INDEX IF NOT EXISTS idx_fl_expiry ON Food_Listings(Expiry_Date);",
+    "CREATE INDEX IF NOT EXISTS idx_claims_food ON Claims(Food_ID);",
+    "CREATE INDEX IF NOT EXISTS idx_claims_receiver ON Claims(Receiver_ID);",
+    "CREATE INDEX IF NOT EXISTS idx_claims_status ON Claims(Status);",
+    "CREATE INDEX IF NOT EXISTS idx_providers_city ON Providers(City);",
+]
+# Read-only queries behind the Data Analysis page, run together as one batch
+ANALYTICS_QUERIES = {
+    "city_counts": """
+        SELECT City, SUM(p) AS NumberOfProviders, SUM(r) AS NumberOfReceivers
+        FROM (SELECT City, 1 AS p, 0 AS r FROM Providers
+              UNION ALL
+              SELECT City, 0, 1 FROM Receivers)
+        GROUP BY City
+        ORDER BY NumberOfProviders DESC;
+    """,
+    "city_list": "SELECT DISTINCT City FROM Providers ORDER BY City;",
+    "common_food_types": "SELECT Food_Type, COUNT(Food_ID) AS Count FROM Food_Listings GROUP BY Food_Type ORDER BY Count DESC;",
+    "successful_claims": "SELECT p.Name, COUNT(c.Claim_ID) AS SuccessfulClaims FROM Claims c JOIN Food_Listings fl ON c.Food_ID = fl.Food_ID JOIN Providers p ON fl.Provider_ID = p.Provider_ID WHERE c.Status = 'Completed' GROUP BY p.Name ORDER BY SuccessfulClaims DESC LIMIT 5;",
+    "claims_per_item": "SELECT fl.Food_Name, COUNT(c.Claim_ID) AS NumberOfClaims FROM Claims c JOIN Food_Listings fl ON c.Food_ID = fl.Food_ID GROUP BY fl.Food_Name ORDER BY NumberOfClaims DESC LIMIT 10;",
+    "claim_status": "SELECT Status, COUNT(Claim_ID) AS Count FROM Claims GROUP BY Status;",
+    "meal_type_claims": "SELECT fl.Meal_Type, COUNT(c.Claim_ID) as ClaimCount FROM Claims c JOIN Food_Listings fl ON c.Food_ID = fl.Food_ID GROUP BY fl.Meal_Type ORDER BY ClaimCount DESC;",
+    "provider_donations": "SELECT p.Name, SUM(fl.Quantity) as TotalQuantity FROM Providers p JOIN Food_Listings fl ON p.Provider_ID = fl.Provider_ID GROUP BY p.Name ORDER BY TotalQuantity DESC LIMIT 10;",
+    # Backs both the top-type-by-quantity card (2) and the listings-by-type card (14)
+    "provider_type_totals": """
+        SELECT Provider_Type, COUNT(Food_ID) AS NumberOfListings, SUM(Quantity) AS TotalQuantityDonated
+        FROM Food_Listings
+        GROUP BY Provider_Type
+        ORDER BY NumberOfListings DESC;
+    """,
+    "most_claimed_meal": """
+        SELECT fl.Meal_Type, COUNT(c.Claim_ID) as ClaimCount
+        FROM Claims c
+        JOIN Food_Listings fl ON c.Food_ID = fl.Food_ID
+        WHERE c.Status = 'Completed'
+        GROUP BY fl.Meal_Type
+        ORDER BY ClaimCount DESC;
+    """,
+}
+# Single-row Data Analysis queries; the snapshot keeps their fetchone() rows
+ANALYTICS_ROWS = {
+    "total_quantity_available": "SELECT COALESCE(SUM(Quantity), 0) FROM Food_Listings;",
+    "city_listings": "SELECT Location, COUNT(Food_ID) AS NumberOfListings FROM Food_Listings GROUP BY Location ORDER BY NumberOfListings DESC LIMIT 1;",
+}
 
 # --- Database Functions ---
 
 def get_db_connection():
     """Establishes a connection to the SQLite database."""
     try:
-        conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+        # Autocommit mode; multi-statement work opens its own explicit transaction
+        conn = sqlite3.connect(DB_FILE, check_same_thread=False, isolation_level=None)
         # Enable foreign key constraint enforcement
         conn.execute("PRAGMA foreign_keys = ON")
+        # WAL lets readers run alongside the writer; NORMAL sync is safe under WAL
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA cache_size = -64000")  # ~64 MB page cache
+        conn.execute("PRAGMA mmap_size = 268435456")  # 256 MB
         return conn
     except sqlite3.Error as e:
         st.error(f"Database connection error: {e}")
         return None
 
+@st.cache_resource
+def get_conn():
+    """
+    Returns the shared database connection, creating and seeding the
+    database on first use. Cached so this runs once per server process
+    rather than on every Streamlit rerun.
+    """
+    conn = get_db_connection()
+    if conn is not None:
+        try:
+            setup_database(conn)
+        except Exception as e:
+            # Report every setup failure here; returning None makes main() drop
+            # this cache entry so setup is retried on the next rerun
+            st.error(f"Database setup error: {e}")
+            conn.close()
+            return None
+    return conn
+
+def seed_rows(chunk):
+    """Returns the rows of a seed CSV chunk as plain tuples that sqlite3 can bind."""
+    for column in chunk.select_dtypes(include="datetime").columns:
+        chunk[column] = chunk[column].dt.strftime(DB_DATE_FORMATS[column])
+    return chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None)
+
 def setup_database(conn):
     """
     Sets up the database. Creates tables and loads data from CSV files
@@ -38,43 +143,200 @@ def setup_database(conn):
         "Food_Listings": "CREATE TABLE IF NOT EXISTS Food_Listings (Food_ID INTEGER PRIMARY KEY AUTOINCREMENT, Food_Name TEXT, Quantity INTEGER, Expiry_Date DATE, Provider_ID INTEGER, Provider_Type TEXT, Location TEXT, Food_Type TEXT, Meal_Type TEXT, FOREIGN KEY (Provider_ID) REFERENCES Providers (Provider_ID) ON DELETE CASCADE);",
         "Claims": "CREATE TABLE IF NOT EXISTS Claims (Claim_ID INTEGER PRIMARY KEY AUTOINCREMENT, Food_ID INTEGER, Receiver_ID INTEGER, Status TEXT, Timestamp DATETIME, FOREIGN KEY (Food_ID) REFERENCES Food_Listings (Food_ID) ON DELETE CASCADE, FOREIGN KEY (Receiver_ID) REFERENCES Receivers (Receiver_ID) ON DELETE CASCADE);"
     }
-    for table_name, schema in tables.items():
-        cursor.execute(schema)
-    for table_name in tables.keys():
-        cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-        if cursor.fetchone()[0] == 0:
-            csv_file = os.path.join(DATA_DIR, f"{table_name.lower()}_data.csv")
-            if os.path.exists(csv_file):
-                try:
-                    df = pd.read_csv(csv_file)
-                    # Clean column names before inserting into SQL
-                    df.columns = df.columns.str.strip()
-                    df.to_sql(table_name, conn, if_exists='append', index=False)
-                except Exception as e:
-                    st.error(f"Error loading data for {table_name}: {e}")
-    conn.commit()
+    # The schema, checks and seed data run in one explicit transaction: a single
+    # commit on success, and nothing is left half-created if any step fails
+    with conn:
+        cursor.execute("BEGIN")
+        for table_name, schema in tables.items():
+            cursor.execute(schema)
+        # Indexes for the join keys and filters used by the analysis queries
+        for index_sql in INDEXES:
+            cursor.execute(index_sql)
+        for table_name in tables.keys():
+            cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
+            if cursor.fetchone()[0] == 0:
+                csv_file = os.path.join(DATA_DIR, f"{table_name.lower()}_data.csv")
+                if os.path.exists(csv_file):
+                    try:
+                        # Stream the file so memory use is bounded by the chunk size. Every
+                        # chunk goes into the setup transaction, so a failure part-way
+                        # through leaves the table empty and it is re-seeded next time
+                        for chunk in pd.read_csv(csv_file, chunksize=CSV_CHUNKSIZE, dtype=CSV_DTYPES[table_name], parse_dates=list(CSV_DATE_FORMATS.get(table_name, {})), date_format=CSV_DATE_FORMATS.get(table_name)):
+                            # Clean column names before inserting into SQL
+                            chunk.columns = chunk.columns.str.strip()
+                            # executemany stays inside the transaction; to_sql would commit it
+                            insert_sql = f"INSERT INTO {table_name} ({', '.join(chunk.columns)}) VALUES ({', '.join('?' * len(chunk.columns))})"
+                            cursor.executemany(insert_sql, seed_rows(chunk))
+                    except Exception as e:
+                        # Roll back the whole setup transaction; get_conn() reports the error
+                        raise RuntimeError(f"Error loading data for {table_name}: {e}") from e
+
+def open_read_connection():
+    """Opens a read-only connection to the SQLite database."""
+    conn = sqlite3.connect(f"file:{DB_FILE}?mode=ro", uri=True, check_same_thread=False)
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+@st.cache_resource
+def get_read_pool(size=4):
+    """
+    Returns a pool of read-only connections shared by all sessions, so
+    concurrent reads don't serialize on the single write connection.
+    """
+    # Make sure the database exists and is seeded before opening readers
+    get_conn()
+    pool = queue.Queue()
+    for _ in range(size):
+        pool.put(open_read_connection())
+    return pool
+
+@contextmanager
+def read_conn(pool=None):
+    """Borrows a connection from the read pool for the duration of the block."""
+    pool = pool or get_read_pool()
+    conn = pool.get()
+    try:
+        yield conn
+    finally:
+        pool.put(conn)
+
+def read_sql(sql, params=(), pool=None):
+    """Runs a read-only query on a pooled connection and returns a DataFrame."""
+    with read_conn(pool) as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def q(sql, params=()):
+    """Runs a read-only query and caches the resulting DataFrame."""
+    return read_sql(sql, params)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def q_arrow(sql, params=()):
+    """
+    Like q(), but caches the result as a pyarrow Table so st.dataframe can
+    skip the pandas-to-Arrow conversion on every rerun.
+    """
+    return pa.Table.from_pandas(read_sql(sql, params), preserve_index=False)
+
+def read_row(sql, params=(), pool=None):
+    """
+    Runs a query expected to return at most one row and returns that row as a
+    tuple (or None), skipping the DataFrame for single-value aggregates.
+    """
+    with read_conn(pool) as conn:
+        return conn.execute(sql, params).fetchone()
+
+# Provider columns used by the CRUD page's form and delete tab
+PROVIDERS_SQL = "SELECT Provider_ID, Name, Type, City FROM Providers"
+
+def load_providers():
+    """Returns the provider ID, name, type and city used by the CRUD page (cached through q())."""
+    return q(PROVIDERS_SQL)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_home_preview():
+    """Returns the first few listings shown on the Home page, only the columns displayed."""
+    return read_sql("SELECT Food_Name, Quantity, Expiry_Date, Location, Meal_Type FROM Food_Listings ORDER BY Expiry_Date LIMIT 10;")
+
+@st.cache_resource
+def get_query_executor():
+    """Thread pool shared by all sessions for running read queries concurrently."""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="query")
+
+@st.cache_resource(show_spinner=False)
+def analytics_snapshot(version):
+    """
+    Runs every query in ANALYTICS_QUERIES and ANALYTICS_ROWS concurrently and
+    returns the results (DataFrames and row tuples respectively) keyed by
+    query name. Each worker borrows its own connection
+    from the read pool; WAL mode lets the readers run side by side.
+    The snapshot is kept until a CRUD write clears it, so the Data Analysis
+    page issues no queries while the data is unchanged.
+    """
+    # Resolve the pool here; worker threads have no Streamlit script context
+    pool = get_read_pool()
+    executor = get_query_executor()
+    frames = executor.map(lambda sql: read_sql(sql, pool=pool), ANALYTICS_QUERIES.values())
+    rows = executor.map(lambda sql: read_row(sql, pool=pool), ANALYTICS_ROWS.values())
+    return {**dict(zip(ANALYTICS_QUERIES, frames)), **dict(zip(ANALYTICS_ROWS, rows))}
 
 # --- CRUD Functions ---
+# Statement text is kept constant so SQLite's statement cache can reuse the compiled plans
+INSERT_PROVIDER_SQL = "INSERT INTO Providers (Name, Type, Address, City, Contact) VALUES (?, ?, ?, ?, ?)"
+INSERT_FOOD_LISTING_SQL = "INSERT INTO Food_Listings (Food_Name, Quantity, Expiry_Date, Provider_ID, Provider_Type, Location, Food_Type, Meal_Type) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+DELETE_LISTING_SQL = "DELETE FROM Food_Listings WHERE Food_ID = ?"
+DELETE_PROVIDER_SQL = "DELETE FROM Providers WHERE Provider_ID = ?"
+
+@st.cache_resource
+def get_data_version():
+    """
+    Holds the data version shared by every session. CRUD writes bump it, and
+    it is the cache key for data derived from the tables.
+    """
+    return {"value": 0}
+
+def data_version():
+    return get_data_version()["value"]
+
+def invalidate_caches():
+    """Drops cached query results and bumps the data version after a write."""
+    st.cache_data.clear()
+    analytics_snapshot.clear()
+    get_data_version()["value"] += 1
+
+@st.cache_resource
+def get_write_lock():
+    """
+    Serializes writes on the shared connection across sessions and threads, so
+    one session's BEGIN can't collide with (or roll back) another's. Cached
+    because the script module itself is re-executed on every rerun.
+    """
+    return threading.Lock()
+
 def add_provider(conn, name, p_type, address, city, contact):
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO Providers (Name, Type, Address, City, Contact) VALUES (?, ?, ?, ?, ?)", (name, p_type, address, city, contact))
-    conn.commit()
+    with get_write_lock():
+        # A single statement; the autocommit connection commits it on its own
+        conn.execute(INSERT_PROVIDER_SQL, (name, p_type, address, city, contact))
+        invalidate_caches()
 
 def add_food_listing(conn, food_name, quantity, expiry_date, provider_id, provider_type, location, food_type, meal_type):
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO Food_Listings (Food_Name, Quantity, Expiry_Date, Provider_ID, Provider_Type, Location, Food_Type, Meal_Type) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                   (food_name, quantity, expiry_date, provider_id, provider_type, location, food_type, meal_type))
-    conn.commit()
+    with get_write_lock():
+        # A single statement; the autocommit connection commits it on its own
+        conn.execute(INSERT_FOOD_LISTING_SQL,
+                     (food_name, quantity, expiry_date, provider_id, provider_type, location, food_type, meal_type))
+        invalidate_caches()
 
 def delete_listing(conn, food_id):
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM Food_Listings WHERE Food_ID = ?", (food_id,))
-    conn.commit()
+    with get_write_lock():
+        # The FK cascade to Claims runs inside this one transaction
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute(DELETE_LISTING_SQL, (food_id,))
+        invalidate_caches()
 
 def delete_provider(conn, provider_id):
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM Providers WHERE Provider_ID = ?", (provider_id,))
-    conn.commit()
+    with get_write_lock():
+        # The FK cascade (listings, then claims) runs inside this one transaction
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute(DELETE_PROVIDER_SQL, (provider_id,))
+        invalidate_caches()
+
+# --- Selectbox Options ---
+@st.cache_data(show_spinner=False)
+def listing_choices(version):
+    """Maps delete-tab labels to Food_IDs; `version` changes whenever the data does."""
+    # Read directly rather than through q(), whose unversioned cache can be
+    # refilled with pre-write rows by a query that was in flight during a write
+    listing_list = read_sql("SELECT Food_ID, Food_Name, Location FROM Food_Listings")
+    return {f"{name} (ID: {food_id}) in {location}": food_id for name, food_id, location in zip(listing_list['Food_Name'].tolist(), listing_list['Food_ID'].tolist(), listing_list['Location'].tolist())}
+
+@st.cache_data(show_spinner=False)
+def provider_choices(version):
+    """Maps delete-tab labels to Provider_IDs; `version` changes whenever the data does."""
+    # Read directly for the same reason as listing_choices()
+    providers = read_sql(PROVIDERS_SQL)
+    return {f"{name} (ID: {provider_id})": provider_id for name, provider_id in zip(providers['Name'].tolist(), providers['Provider_ID'].tolist())}
 
 
 # --- Main Application ---
@@ -82,10 +344,10 @@ def main():
     st.set_page_config(page_title="Food Waste Management", layout="wide")
     st.title("Local Food Wastage Management System")
     
-    conn = get_db_connection()
-    if conn:
-        setup_database(conn)
-    else:
+    conn = get_conn()
+    if conn is None:
+        # Don't keep a failed connection attempt cached
+        get_conn.clear()
         st.stop()
 
     st.sidebar.title("Dashboard Menu")
@@ -97,7 +359,7 @@ def main():
         st.info("Use the sidebar to navigate to different sections of the application.")
         st.subheader("Preview of Available Food Listings")
         try:
-            food_df = pd.read_sql_query("SELECT * FROM Food_Listings LIMIT 10;", conn)
+            food_df = load_home_preview()
             st.dataframe(food_df)
         except Exception as e:
             st.error(f"Could not retrieve food listings: {e}")
@@ -105,6 +367,9 @@ def main():
     elif page == "CRUD Operations":
         st.header("📝 Manage Records (CRUD)")
         
+        # Same columns as provider_choices() reads, via PROVIDERS_SQL
+        providers = load_providers()
+
         tab1, tab2, tab3 = st.tabs(["Add Records", "View Records", "Delete Records"])
 
         with tab1:
@@ -124,19 +389,19 @@ def main():
 
             st.subheader("Add a New Food Listing")
             with st.form("add_food_listing_form", clear_on_submit=True):
-                provider_list = pd.read_sql_query("SELECT Provider_ID, Name FROM Providers", conn)
-                provider_dict = dict(zip(provider_list['Name'], provider_list['Provider_ID']))
+                # The dropdown and the selected provider's details both come from `providers`
+                provider_dict = dict(zip(providers['Name'], providers['Provider_ID']))
                 
-                selected_provider_name = st.selectbox("Select Provider", provider_list['Name'])
+                selected_provider_name = st.selectbox("Select Provider", providers['Name'])
                 food_name = st.text_input("Food Item Name")
                 quantity = st.number_input("Quantity", min_value=1, step=1)
                 expiry_date = st.date_input("Expiry Date")
                 
                 provider_id = provider_dict.get(selected_provider_name)
-                provider_details = pd.read_sql_query(f"SELECT Type, City FROM Providers WHERE Provider_ID = {provider_id}", conn) if provider_id else None
+                provider_details = providers.loc[providers['Provider_ID'] == provider_id]
                 
-                provider_type = provider_details['Type'][0] if provider_details is not None and not provider_details.empty else ""
-                location = provider_details['City'][0] if provider_details is not None and not provider_details.empty else ""
+                provider_type = provider_details['Type'].iloc[0] if not provider_details.empty else ""
+                location = provider_details['City'].iloc[0] if not provider_details.empty else ""
 
                 food_type = st.selectbox("Food Type", ["Vegetarian", "Non-Vegetarian", "Vegan"])
                 meal_type = st.selectbox("Meal Type", ["Breakfast", "Lunch", "Dinner", "Snacks"])
@@ -148,17 +413,16 @@ def main():
         
         with tab2:
             st.subheader("View All Food Listings")
-            all_listings = pd.read_sql_query("SELECT * FROM Food_Listings ORDER BY Expiry_Date ASC", conn)
+            all_listings = q_arrow("SELECT * FROM Food_Listings ORDER BY Expiry_Date ASC")
             st.dataframe(all_listings)
             
             st.subheader("View All Providers")
-            all_providers = pd.read_sql_query("SELECT * FROM Providers", conn)
+            all_providers = q_arrow("SELECT * FROM Providers")
             st.dataframe(all_providers)
 
         with tab3:
             st.subheader("Delete a Food Listing")
-            listing_list = pd.read_sql_query("SELECT Food_ID, Food_Name, Location FROM Food_Listings", conn)
-            listing_options = {f"{row['Food_Name']} (ID: {row['Food_ID']}) in {row['Location']}": row['Food_ID'] for index, row in listing_list.iterrows()}
+            listing_options = listing_choices(data_version())
             
             selected_listing_str = st.selectbox("Select Listing to Delete", options=listing_options.keys())
             if st.button("Delete Selected Listing"):
@@ -171,8 +435,7 @@ def main():
 
             st.subheader("Delete a Provider")
             st.warning("Warning: Deleting a provider will also delete all of their associated food listings.")
-            provider_list_del = pd.read_sql_query("SELECT Provider_ID, Name FROM Providers", conn)
-            provider_options_del = {f"{row['Name']} (ID: {row['Provider_ID']})": row['Provider_ID'] for index, row in provider_list_del.iterrows()}
+            provider_options_del = provider_choices(data_version())
 
             selected_provider_str = st.selectbox("Select Provider to Delete", options=provider_options_del.keys())
             if st.button("Delete Selected Provider"):
@@ -184,57 +447,57 @@ def main():
     elif page == "Data Analysis":
         st.header("📊 Data Analysis & Insights")
         st.write("This section displays the analysis based on the SQL queries.")
+        analysis = analytics_snapshot(data_version())
         col1, col2 = st.columns(2)
         with col1:
             st.subheader("1. Provider and Receiver Counts by City")
-            providers_by_city = pd.read_sql_query("SELECT City, COUNT(Provider_ID) AS NumberOfProviders FROM Providers GROUP BY City ORDER BY NumberOfProviders DESC;", conn)
-            receivers_by_city = pd.read_sql_query("SELECT City, COUNT(Receiver_ID) AS NumberOfReceivers FROM Receivers GROUP BY City ORDER BY NumberOfReceivers DESC;", conn)
-            city_counts = pd.merge(providers_by_city, receivers_by_city, on="City", how="outer").fillna(0)
+            city_counts = analysis["city_counts"]
             st.dataframe(city_counts, height=250)
             st.subheader("2. Top Contributing Food Provider Type")
-            top_provider_type = pd.read_sql_query("SELECT p.Type, SUM(fl.Quantity) AS TotalQuantityDonated FROM Providers p JOIN Food_Listings fl ON p.Provider_ID = fl.Provider_ID GROUP BY p.Type ORDER BY TotalQuantityDonated DESC LIMIT 1;", conn)
-            if not top_provider_type.empty:
-                st.metric(label="Top Contributor (by Quantity)", value=top_provider_type['Type'][0], delta=f"{int(top_provider_type['TotalQuantityDonated'][0])} units donated")
+            provider_type_totals = analysis["provider_type_totals"]
+            if not provider_type_totals.empty:
+                top_provider_type = provider_type_totals.sort_values('TotalQuantityDonated', ascending=False).iloc[0]
+                st.metric(label="Top Contributor (by Quantity)", value=top_provider_type['Provider_Type'], delta=f"{int(top_provider_type['TotalQuantityDonated'])} units donated")
             st.subheader("4. Total Quantity of Available Food")
-            total_quantity_available = pd.read_sql_query("SELECT SUM(Quantity) AS TotalQuantity FROM Food_Listings;", conn)
-            if not total_quantity_available.empty:
-                st.metric(label="Total Food Units Available Now", value=f"{int(total_quantity_available['TotalQuantity'][0])}")
+            (total_quantity_available,) = analysis["total_quantity_available"]
+            st.metric(label="Total Food Units Available Now", value=f"{int(total_quantity_available)}")
         with col2:
             st.subheader("3. Find Provider Contact Information by City")
-            city_list = pd.read_sql_query("SELECT DISTINCT City FROM Providers ORDER BY City;", conn)['City'].tolist()
+            city_list = analysis["city_list"]['City'].tolist()
             selected_city = st.selectbox("Select a City", city_list)
             if selected_city:
-                provider_contacts = pd.read_sql_query(f"SELECT Name AS ProviderName, Contact, Address FROM Providers WHERE City = '{selected_city}';", conn)
+                provider_contacts = q("SELECT Name AS ProviderName, Contact, Address FROM Providers WHERE City = ?;", params=(selected_city,))
                 st.dataframe(provider_contacts, height=250)
             st.subheader("5. City with the Most Food Listings")
-            city_listings = pd.read_sql_query("SELECT Location, COUNT(Food_ID) AS NumberOfListings FROM Food_Listings GROUP BY Location ORDER BY NumberOfListings DESC LIMIT 1;", conn)
-            if not city_listings.empty:
-                st.metric(label="Most Active City", value=city_listings['Location'][0], delta=f"{int(city_listings['NumberOfListings'][0])} listings")
+            city_listings = analysis["city_listings"]
+            if city_listings is not None:
+                location, number_of_listings = city_listings
+                st.metric(label="Most Active City", value=location, delta=f"{number_of_listings} listings")
         st.divider()
         col3, col4 = st.columns(2)
         with col3:
             st.subheader("6. Most Common Food Types")
-            common_food_types = pd.read_sql_query("SELECT Food_Type, COUNT(Food_ID) AS Count FROM Food_Listings GROUP BY Food_Type ORDER BY Count DESC;", conn)
+            common_food_types = analysis["common_food_types"]
             st.bar_chart(common_food_types.set_index('Food_Type'))
             st.subheader("9. Provider with Most Successful Claims")
-            successful_claims = pd.read_sql_query("SELECT p.Name, COUNT(c.Claim_ID) AS SuccessfulClaims FROM Claims c JOIN Food_Listings fl ON c.Food_ID = fl.Food_ID JOIN Providers p ON fl.Provider_ID = p.Provider_ID WHERE c.Status = 'Completed' GROUP BY p.Name ORDER BY SuccessfulClaims DESC LIMIT 5;", conn)
+            successful_claims = analysis["successful_claims"]
             st.dataframe(successful_claims)
         with col4:
             st.subheader("7. Top 10 Most Claimed Food Items")
-            claims_per_item = pd.read_sql_query("SELECT fl.Food_Name, COUNT(c.Claim_ID) AS NumberOfClaims FROM Claims c JOIN Food_Listings fl ON c.Food_ID = fl.Food_ID GROUP BY fl.Food_Name ORDER BY NumberOfClaims DESC LIMIT 10;", conn)
+            claims_per_item = analysis["claims_per_item"]
             st.dataframe(claims_per_item)
             st.subheader("10. Distribution of Claim Statuses")
-            claim_status = pd.read_sql_query("SELECT Status, COUNT(Claim_ID) AS Count FROM Claims GROUP BY Status;", conn)
+            claim_status = analysis["claim_status"]
             st.bar_chart(claim_status.set_index('Status'))
         st.divider()
         col5, col6 = st.columns(2)
         with col5:
             st.subheader("12. Most Claimed Meal Types (All Claims)")
-            meal_type_claims = pd.read_sql_query("SELECT fl.Meal_Type, COUNT(c.Claim_ID) as ClaimCount FROM Claims c JOIN Food_Listings fl ON c.Food_ID = fl.Food_ID GROUP BY fl.Meal_Type ORDER BY ClaimCount DESC;", conn)
+            meal_type_claims = analysis["meal_type_claims"]
             st.bar_chart(meal_type_claims.set_index('Meal_Type'))
         with col6:
             st.subheader("13. Total Food Donated per Provider")
-            provider_donations = pd.read_sql_query("SELECT p.Name, SUM(fl.Quantity) as TotalQuantity FROM Providers p JOIN Food_Listings fl ON p.Provider_ID = fl.Provider_ID GROUP BY p.Name ORDER BY TotalQuantity DESC LIMIT 10;", conn)
+            provider_donations = analysis["provider_donations"]
             st.dataframe(provider_donations)
         
         # --- NEW ANALYSIS SECTION ---
@@ -244,12 +507,7 @@ def main():
 
         with col7:
             st.subheader("14. Provider with Most Listings (by Count)")
-            provider_listings = pd.read_sql_query("""
-                SELECT Provider_Type, COUNT(Food_ID) AS NumberOfListings
-                FROM Food_Listings
-                GROUP BY Provider_Type
-                ORDER BY NumberOfListings DESC;
-            """, conn)
+            provider_listings = provider_type_totals[['Provider_Type', 'NumberOfListings']]
             
             if not provider_listings.empty:
                 top_provider = provider_listings.iloc[0]
@@ -259,14 +517,7 @@ def main():
 
         with col8:
             st.subheader("15. Most Successfully Claimed Meal Type")
-            most_claimed_meal = pd.read_sql_query("""
-                SELECT fl.Meal_Type, COUNT(c.Claim_ID) as ClaimCount
-                FROM Claims c
-                JOIN Food_Listings fl ON c.Food_ID = fl.Food_ID
-                WHERE c.Status = 'Completed'
-                GROUP BY fl.Meal_Type
-                ORDER BY ClaimCount DESC;
-            """, conn)
+            most_claimed_meal = analysis["most_claimed_meal"]
 
             if not most_claimed_meal.empty:
                 top_meal = most_claimed_meal.iloc[0]
@@ -275,8 +526,6 @@ def main():
                     st.dataframe(most_claimed_meal)
 
 
-    conn.close()
-
 if __name__ == "__main__":
     if not os.path.isdir(DATA_DIR):
         st.error(f"Data directory not found! Please create a '{DATA_DIR}' folder and place your CSV files in it.")